@@ -1,6 +1,8 @@
 """Flask application factory for the MindPulse Endpoint POC."""
 
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from pathlib import Path
 
@@ -10,6 +12,8 @@ from mindpulse_endpoint_poc import initial_settings
 from mindpulse_endpoint_poc.api_v1 import register_api_v1_routes
 from mindpulse_endpoint_poc import admin_routes
 from mindpulse_endpoint_poc import utils
+from mindpulse_endpoint_poc.json_provider import OrjsonProvider
+from mindpulse_endpoint_poc.upload_request import UploadRequest
 
 
 def create_app() -> Flask:
@@ -24,6 +28,8 @@ def create_app() -> Flask:
     # Get configuration using shared function
     # Create Flask app
     app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.json = OrjsonProvider(app)
 
     # Load configuration
     app.config.from_object(initial_settings)
@@ -35,10 +41,18 @@ def create_app() -> Flask:
         level=logging.INFO,
         format="%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]",
     )
-    if app.debug or app.testing:
+    if app.debug:
         app.logger.setLevel(logging.DEBUG)
 
-    app.logger.debug(f"App config: {app.config}")
+    # Lazy formatting: the whole config is only stringified if it gets logged
+    app.logger.debug("App config: %s", app.config)
+
+    # Shared by every upload request for saving its files in parallel, rather
+    # than starting (and tearing down) a pool of threads per request. Threads
+    # are only started as they're needed.
+    app.extensions["upload_executor"] = ThreadPoolExecutor(
+        max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="upload"
+    )
 
     # Register routes
     register_api_v1_routes(app)
@@ -94,6 +108,16 @@ def initialize_state(config: dict) -> None:
     config["MAX_CONTENT_LENGTH_RAW"] = config["MAX_CONTENT_LENGTH"]
     config["MAX_CONTENT_LENGTH"] = max_content_length
 
+    config["UPLOAD_SPOOL_MAX_SIZE_RAW"] = config["UPLOAD_SPOOL_MAX_SIZE"]
+    config["UPLOAD_SPOOL_MAX_SIZE"] = utils.parse_size_string(
+        config["UPLOAD_SPOOL_MAX_SIZE"]
+    )
+
+    config["UPLOAD_PARSE_BUFFER_SIZE_RAW"] = config["UPLOAD_PARSE_BUFFER_SIZE"]
+    config["UPLOAD_PARSE_BUFFER_SIZE"] = utils.parse_size_string(
+        config["UPLOAD_PARSE_BUFFER_SIZE"]
+    )
+
     config["UPLOAD_PATH_RAW"] = config["UPLOAD_PATH"]
     upload_path = Path(config["UPLOAD_PATH"])
     upload_path.mkdir(exist_ok=True, parents=True)
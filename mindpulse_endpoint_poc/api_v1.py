@@ -52,8 +52,13 @@ def register_api_v1_routes(app):
         if request.method != "POST":
             return {"error": "Only POST method allowed"}, 405
 
-        # Handle empty request
-        if not request.files:
+        # Handle empty request; bodies that can't hold any files are answered
+        # from the headers alone, without running the form parser
+        if (
+            request.mimetype != "multipart/form-data"
+            or request.content_length == 0
+            or not request.files
+        ):
             return {
                 "message": "No files provided",
                 "successes": [],
@@ -64,7 +69,11 @@ def register_api_v1_routes(app):
         batch = Batch.setup_for_transfer(
             app.config["INCOMING_BATCH_PATH"], app.config["COMPLETE_BATCH_PATH"]
         )
-        batch.process_batch(request.files, app.config["KEYS_PATH"])
+        batch.process_batch(
+            request.files,
+            app.config["KEYS_PATH"],
+            executor=app.extensions["upload_executor"],
+        )
 
         # Build response
         successes = [mpfile.path.name for mpfile in batch.success_files]
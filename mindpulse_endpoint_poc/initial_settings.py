@@ -9,8 +9,25 @@ UPLOAD_PATH = "/tmp/mindpulse_uploads"
 # Parse MAX_CONTENT_LENGTH from human-readable string
 MAX_CONTENT_LENGTH = "16M"
 
+# Uploaded files bigger than this are spooled to a temp file on disk while the
+# request is parsed, rather than held in memory
+UPLOAD_SPOOL_MAX_SIZE = "1M"
+
+# How much of an upload's body is read at a time while parsing it
+UPLOAD_PARSE_BUFFER_SIZE = "256K"
+
 KEYS_PATH = "/tmp/mindpulse_keys"
 
+# Batch processor directory watching. inotify doesn't see writes made by other
+# hosts on NFS/CIFS, so on those mounts (detected automatically, or forced here)
+# we poll instead, every WATCH_POLL_INTERVAL seconds
+WATCH_FORCE_POLLING = False
+WATCH_POLL_INTERVAL = 60
+
+# Threads the batch processor uses to decrypt a batch's files in parallel.
+# None lets ThreadPoolExecutor pick a default based on the CPU count
+DECRYPT_WORKERS = None
+
 OIDC_ENABLED = False
 
 OIDC_CLIENT_SECRETS = "/tmp/secrets"
@@ -0,0 +1,63 @@
+"""JSON provider that serializes responses with orjson."""
+
+from typing import Any
+
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, which encodes straight to bytes in C.
+
+    Dates, dataclasses, and anything else orjson doesn't handle the same way
+    as Flask are passed through to Flask's default hook. Anything orjson
+    can't encode at all (ints over 64 bits, say) is handed to the default
+    provider instead, as are calls with extra json.dumps options (indent and
+    so on). orjson also writes NaN and Infinity as null, so output with a
+    null in it is re-encoded by the default provider too; the upload and
+    health responses never have one. The output decodes to the same values
+    as DefaultJSONProvider's; it just isn't ASCII-escaped.
+    """
+
+    _options = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+    def _dump_bytes(self, obj: Any) -> bytes:
+        options = self._options
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(obj, default=self.default, option=options)
+        except TypeError:
+            # orjson.JSONEncodeError is a TypeError
+            return super().dumps(obj).encode()
+        # A null may be a non-finite float, which Flask writes as NaN or
+        # Infinity; checking the output is much cheaper than walking obj
+        if b"null" in data:
+            return super().dumps(obj).encode()
+        return data
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dump_bytes(obj).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Debug mode pretty-prints, which orjson doesn't do the same way
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # Flask ends its JSON responses with a newline
+        return self._app.response_class(
+            self._dump_bytes(obj) + b"\n", mimetype=self.mimetype
+        )
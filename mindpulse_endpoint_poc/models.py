@@ -1,5 +1,8 @@
-from dataclasses import dataclass
+import binascii
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+import functools
 import hashlib
 from pathlib import Path
 import re
@@ -7,11 +10,11 @@ import secrets
 import tempfile
 from typing import List, Optional
 import mmap
+import os
 
 from werkzeug.utils import secure_filename
 from werkzeug.security import safe_join
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
 
 from .utils import ensure_directory_exists
@@ -23,6 +26,14 @@ logger = logging.getLogger(__name__)
 
 SHORT_SHA_LEN = 8
 KEY_LEN = 32
+# AES block size in bytes; this is also the IV length and the PKCS7 block size
+BLOCK_LEN = 16
+
+# Runs of anything that can't be part of a lowercase hex key or short sha
+_NON_HEX_RE = re.compile(r"[^0-9a-f]+")
+
+# Copy buffer for saving uploaded files; Werkzeug's default is only 16kB
+SAVE_BUFFER_SIZE = 1024 * 1024
 
 # When we're making a new key, this is the most times we'll try before giving
 # up on filename collisions. This should never, ever, ever come up.
@@ -61,7 +72,7 @@ class EnrollmentKey:
         # search_str should either be an 8-hexchar shortsha or a 64-hexchar key
         search_norm_unsafe = search_str.strip().lower()
         logger.debug(f"{search_norm_unsafe=}")
-        search_filtered = re.sub(r"[^0-9a-f]+", "", search_norm_unsafe)
+        search_filtered = _NON_HEX_RE.sub("", search_norm_unsafe)
         logger.debug(f"{search_filtered=}")
         kb = keys_path.resolve()
         key_file = kb / f"{search_filtered}.key"
@@ -79,12 +90,17 @@ class EnrollmentKey:
     def generate_random(kls):
         return kls(hexdata=secrets.token_hex(KEY_LEN))
 
-    @property
+    @functools.cached_property
     def short_sha(self):
+        # Hashed once per key; hexdata isn't changed after construction
         return short_sha_for_hex(self.hexdata)
 
+    @property
+    def key_bytes(self):
+        return binascii.a2b_hex(self.hexdata)
 
-@dataclass
+
+@dataclass(slots=True)
 class EncryptedMPFile:
     path: Path
     short_id: str
@@ -103,29 +119,31 @@ class EncryptedMPFile:
 
         created_at is in ISO8601 with timezone offset
         """
-        file_path = Path(file_path)
+        if not isinstance(file_path, Path):
+            file_path = Path(file_path)
         filename = file_path.name
+        name_without_ext = file_path.stem
+
+        # Most misnamed uploads fail here; reject them before splitting, and
+        # without raising and re-wrapping an inner exception
+        if name_without_ext.count("_") < 3:
+            raise ValueError(
+                f"Invalid filename format '{filename}': "
+                f"Filename must have at least 4 parts separated by underscores: {filename}"
+            )
 
         try:
-            # Split filename into parts
-            name_without_ext = file_path.stem
-            parts = name_without_ext.split("_")
-
-            if len(parts) < 4:
-                raise ValueError(
-                    f"Filename must have at least 4 parts separated by underscores: {filename}"
-                )
+            # Split filename into parts; we only look at the first four, so
+            # don't bother splitting up the rest
+            parts = name_without_ext.split("_", 4)
 
-            short_id = parts[0]
-            created_at_str = parts[1]
-            type_part = parts[2]
-            iv_part = parts[3]
+            short_id, created_at_str, type_part, iv_part = parts[:4]
 
             # Parse created_at
             created_at = datetime.fromisoformat(created_at_str)
 
             # Parse IV (should be hex string)
-            iv = bytes.fromhex(iv_part)
+            iv = binascii.a2b_hex(iv_part)
 
             return kls(
                 path=file_path,
@@ -171,47 +189,97 @@ class Batch:
             error_messages=[],
         )
 
-    def process_batch(self, files, keys_path):
-        self._process_files(files, keys_path)
+    def process_batch(self, files, keys_path, executor: Optional[Executor] = None):
+        self._process_files(files, keys_path, executor)
         self._move_to_complete()
 
-    def _process_files(self, files, keys_path):
+    def _process_files(self, files, keys_path, executor: Optional[Executor] = None):
         """
         Process a batch of files, saving them to the batch directory
 
         Args:
             files: Dict of file objects from Flask request.files
             keys_path: Path to enrollment keys directory
+            executor: Pool to save files in parallel with; without one, they're
+                saved one after another
         """
 
-        for file_key, file_obj in files.items():
-            try:
-                safe_filename = secure_filename(file_obj.filename)
-                logger.debug(f"Processing {file_key}: {safe_filename}")
+        items = list(files.items())
+        results = [None] * len(items)
+
+        # Parts whose names are the same once made safe would be saved to the
+        # same path, and saving those at once could interleave their bytes on
+        # disk. Keep the first of each name and fail the rest.
+        jobs = []
+        seen_names = set()
+        for i, (file_key, file_obj) in enumerate(items):
+            safe_filename = secure_filename(file_obj.filename)
+            if safe_filename in seen_names:
+                message = (
+                    f"Error processing {file_obj.filename}: "
+                    f"Duplicate filename {safe_filename} in upload"
+                )
+                logger.warning(message)
+                results[i] = (None, message)
+            else:
+                seen_names.add(safe_filename)
+                jobs.append((i, file_key, file_obj, safe_filename))
+
+        # Each remaining file is independent, and saving them is mostly I/O
+        # that releases the GIL, so handle them in parallel. map() hands the
+        # results back in the order the jobs were given.
+        if executor is not None and len(jobs) > 1:
+            job_results = executor.map(
+                lambda job: self._process_file(*job[1:], keys_path), jobs
+            )
+        else:
+            job_results = [self._process_file(*job[1:], keys_path) for job in jobs]
+        for (i, *_), result in zip(jobs, job_results):
+            results[i] = result
 
-                # Validate filename format by attempting to parse it
-                mpfile_temp = EncryptedMPFile.from_filename(safe_filename)
+        for (file_key, file_obj), (mpfile, message) in zip(items, results):
+            if mpfile is not None:
+                self.success_files.append(mpfile)
+            else:
+                self.error_messages.append(message)
+                self.failure_files.append(file_obj.filename)
 
-                # Validate enrollment key exists
-                try:
-                    EnrollmentKey.load_for_short_sha(keys_path, mpfile_temp.short_id)
-                except FileNotFoundError:
-                    raise ValueError(f"Enrollment key for {mpfile_temp.short_id} not found")
+    def _process_file(self, file_key, file_obj, safe_filename, keys_path):
+        """
+        Validate and save one uploaded file to the batch directory.
 
-                # Save the file to batch directory
-                target_path = self.batch_path / safe_filename
-                file_obj.save(target_path)
+        Args:
+            safe_filename: file_obj's filename, passed through secure_filename
 
-                # Create EncryptedMPFile object with actual saved path
-                mpfile = EncryptedMPFile.from_filename(target_path)
-                self.success_files.append(mpfile)
-                logger.info(f"Saved {target_path}")
+        Returns:
+            (EncryptedMPFile, None) on success, or (None, error message)
+        """
+        try:
+            logger.debug(f"Processing {file_key}: {safe_filename}")
 
-            except (ValueError, Exception) as e:
-                message = f"Error processing {file_obj.filename}: {e}"
-                logger.warning(message)
-                self.error_messages.append(message)
-                self.failure_files.append(file_obj.filename)
+            # Validate filename format by parsing it; this is the only parse
+            mpfile = EncryptedMPFile.from_filename(safe_filename)
+
+            # Validate enrollment key exists
+            try:
+                EnrollmentKey.load_for_short_sha(keys_path, mpfile.short_id)
+            except FileNotFoundError:
+                raise ValueError(f"Enrollment key for {mpfile.short_id} not found")
+
+            # Save the file to batch directory
+            target_path = self.batch_path / safe_filename
+            file_obj.save(target_path, buffer_size=SAVE_BUFFER_SIZE)
+
+            # Point the parsed file at its actual saved path; the name is the
+            # same, so there's nothing to parse again
+            mpfile = replace(mpfile, path=target_path)
+            logger.info(f"Saved {target_path}")
+            return mpfile, None
+
+        except (ValueError, Exception) as e:
+            message = f"Error processing {file_obj.filename}: {e}"
+            logger.warning(message)
+            return None, message
 
     def _move_to_complete(self):
         """
@@ -233,12 +301,37 @@ def short_sha_for_hex(hex_str):
     b27954ea
     """
     m = hashlib.sha256()
-    key_bytes = bytes.fromhex(hex_str)
+    key_bytes = binascii.a2b_hex(hex_str)
     m.update(key_bytes)
     digest = m.hexdigest()
     return digest[0:SHORT_SHA_LEN]
 
 
+def _pkcs7_pad_length(data):
+    """
+    Returns the length of the PKCS7 padding at the end of data, after checking
+    that it's actually valid padding. Raises ValueError if it isn't, so a
+    corrupt file or wrong key fails loudly instead of being silently truncated.
+    """
+    if len(data) < BLOCK_LEN or len(data) % BLOCK_LEN:
+        raise ValueError("Invalid padding bytes.")
+    pad_len = data[-1]
+    if not 1 <= pad_len <= BLOCK_LEN:
+        raise ValueError("Invalid padding bytes.")
+    if data[-pad_len:] != bytes([pad_len]) * pad_len:
+        raise ValueError("Invalid padding bytes.")
+    return pad_len
+
+
+def _advise_sequential(mm):
+    """
+    Tell the kernel we'll read this mapping front to back, so it reads ahead
+    aggressively. Not every platform has madvise, which is fine.
+    """
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+
+
 class UniqueGenerationError(RuntimeError):
     pass
 
@@ -248,7 +341,25 @@ class PathError(ValueError):
 
 
 @dataclass
-class Encryptor:
+class _AESKeyed:
+    """Base for Encryptor and Decryptor: an AES key, set up once."""
+
+    key: bytes
+    # Built once per key and shared by every file we handle; each file only
+    # needs its own CBC mode (for the IV) and cipher context
+    _algorithm: algorithms.AES = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._algorithm = algorithms.AES(self.key)
+
+    @classmethod
+    def from_enrollment_key(cls, enrollment_key: EnrollmentKey):
+        """Create an encryptor or decryptor from an enrollment key."""
+        return cls(key=enrollment_key.key_bytes)
+
+
+@dataclass
+class Encryptor(_AESKeyed):
     """
     AES-256-CBC encryptor for MindPulse files.
 
@@ -256,80 +367,135 @@ class Encryptor:
     The encrypted format is: IV (16 bytes) + encrypted_data
     """
 
-    key: bytes
+    @staticmethod
+    def generate_iv() -> bytes:
+        """Generate a random IV, for callers that need it before encrypting."""
+        return os.urandom(BLOCK_LEN)
 
-    @classmethod
-    def from_enrollment_key(cls, enrollment_key: EnrollmentKey):
-        """Create encryptor from an enrollment key."""
-        key_bytes = bytes.fromhex(enrollment_key.hexdata)
-        return cls(key=key_bytes)
-
-    def encrypt(self, data: bytes) -> tuple[bytes, bytes]:
+    def encrypt(self, data: bytes, iv: Optional[bytes] = None) -> tuple[bytes, bytes]:
         """
         Encrypt data using AES-256-CBC.
 
         Args:
             data: Raw bytes to encrypt
+            iv: IV to use; a random one is generated if not given
 
         Returns:
             Tuple of (ciphertext, iv)
         """
-        # Generate random IV
-        iv = secrets.token_bytes(16)
+        if iv is None:
+            iv = self.generate_iv()
 
         # Pad data using PKCS7
         padder = padding.PKCS7(128).padder()
         padded_data = padder.update(data) + padder.finalize()
 
         # Encrypt
-        cipher = Cipher(
-            algorithms.AES(self.key), modes.CBC(iv), backend=default_backend()
-        )
+        cipher = Cipher(self._algorithm, modes.CBC(iv))
         encryptor = cipher.encryptor()
         ciphertext = encryptor.update(padded_data) + encryptor.finalize()
 
         # Return ciphertext only and IV separately
         return ciphertext, iv
 
-    def encrypt_file(self, source_path: Path, dest_path: Path) -> bytes:
+    def encrypt_file(
+        self,
+        source_path: Path,
+        dest_path: Path,
+        iv: Optional[bytes] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> bytes:
         """
         Encrypt a file and save to destination.
 
+        Passing in an IV from generate_iv() lets the caller build the final
+        filename (which contains the IV) up front and encrypt straight to it.
+
+        The source is memory mapped, and the cipher reads each chunk straight
+        from the mapping into a reused output buffer, so the plaintext is
+        never copied into Python objects.
+
         Args:
             source_path: Path to source file
             dest_path: Path to encrypted destination file
+            iv: IV to use; a random one is generated if not given
+            chunk_size: Size of chunks to process at once (default: 64KB)
 
         Returns:
             The IV used for encryption
         """
-        with open(source_path, "rb") as f:
-            data = f.read()
+        if iv is None:
+            iv = self.generate_iv()
+
+        with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+            file_size = os.fstat(src.fileno()).st_size
+            if file_size == 0:
+                # Can't mmap an empty file
+                return self.encrypt_stream(src, dst, iv)
+
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _advise_sequential(mm)
+                cipher = Cipher(self._algorithm, modes.CBC(iv))
+                encryptor = cipher.encryptor()
+
+                # Whole blocks go straight through; the last partial block
+                # (possibly empty) gets the PKCS7 padding
+                body_len = file_size - file_size % BLOCK_LEN
+                buffer = bytearray(chunk_size + BLOCK_LEN - 1)
+                with memoryview(buffer) as out, memoryview(mm) as plain:
+                    for offset in range(0, body_len, chunk_size):
+                        end = min(offset + chunk_size, body_len)
+                        n = encryptor.update_into(plain[offset:end], buffer)
+                        dst.write(out[:n])
+                    tail = bytes(plain[body_len:])
+
+                pad_len = BLOCK_LEN - len(tail)
+                last = tail + bytes([pad_len]) * pad_len
+                dst.write(encryptor.update(last) + encryptor.finalize())
+
+        return iv
 
-        ciphertext, iv = self.encrypt(data)
+    def encrypt_stream(
+        self, src_fp, dst_fp, iv: Optional[bytes] = None, chunk_size: int = 64 * 1024
+    ) -> bytes:
+        """
+        Encrypt everything read from src_fp and write the ciphertext to dst_fp,
+        a chunk at a time, so memory use doesn't grow with the file size.
 
-        with open(dest_path, "wb") as f:
-            f.write(ciphertext)
+        Args:
+            src_fp: Binary file object to read plaintext from
+            dst_fp: Binary file object to write ciphertext to
+            iv: IV to use; a random one is generated if not given
+            chunk_size: Size of chunks to read at once (default: 64KB)
+
+        Returns:
+            The IV used for encryption
+        """
+        if iv is None:
+            iv = self.generate_iv()
+
+        padder = padding.PKCS7(128).padder()
+        cipher = Cipher(self._algorithm, modes.CBC(iv))
+        encryptor = cipher.encryptor()
+
+        while chunk := src_fp.read(chunk_size):
+            dst_fp.write(encryptor.update(padder.update(chunk)))
+        dst_fp.write(encryptor.update(padder.finalize()) + encryptor.finalize())
 
         return iv
 
 
 @dataclass
-class Decryptor:
+class Decryptor(_AESKeyed):
     """
     AES-256-CBC decryptor for MindPulse files.
 
     Decrypts files using IV from the filename and encrypted content from the file.
     """
 
-    key: bytes
-
-    @classmethod
-    def from_enrollment_key(cls, enrollment_key: EnrollmentKey):
-        """Create decryptor from an enrollment key."""
-        key_bytes = bytes.fromhex(enrollment_key.hexdata)
-        return cls(key=key_bytes)
-
-    def decrypt(self, mpfile: EncryptedMPFile, chunk_size: int = 64 * 1024) -> bytes:
+    def decrypt(
+        self, mpfile: EncryptedMPFile, chunk_size: int = 64 * 1024
+    ) -> bytearray:
         """
         Decrypt an EncryptedMPFile using memory mapping for efficient processing.
 
@@ -341,63 +507,122 @@ class Decryptor:
             chunk_size: Size of chunks to process at once (default: 64KB)
 
         Returns:
-            Decrypted file data
+            Decrypted file data. This is the buffer it was decrypted into,
+            rather than a bytes copy of it, so the plaintext is only held
+            in memory once; it compares equal to the same bytes.
         """
         with open(mpfile.path, "rb") as f:
-            file_size = f.seek(0, 2)  # Get file size
-            f.seek(0)  # Reset to beginning
+            file_size = os.fstat(f.fileno()).st_size
 
             if file_size == 0:
-                return b""
+                return bytearray()
 
             with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _advise_sequential(mm)
                 # Create cipher
-                cipher = Cipher(
-                    algorithms.AES(self.key),
-                    modes.CBC(mpfile.iv),
-                    backend=default_backend(),
-                )
+                cipher = Cipher(self._algorithm, modes.CBC(mpfile.iv))
                 decryptor = cipher.decryptor()
 
-                # Process the file in chunks - accumulate because we need
-                # complete data to remove PKCS7 padding
-                all_decrypted_data = b""
-
-                for offset in range(0, file_size, chunk_size):
-                    end_offset = min(offset + chunk_size, file_size)
-                    chunk = mm[offset:end_offset]
-
-                    if end_offset == file_size:
-                        # Final chunk - call finalize
-                        decrypted_chunk = decryptor.update(chunk) + decryptor.finalize()
-                    else:
-                        decrypted_chunk = decryptor.update(chunk)
-
-                    all_decrypted_data += decrypted_chunk
-
-                # Remove PKCS7 padding from complete data
-                unpadder = padding.PKCS7(128).unpadder()
-                data = unpadder.update(all_decrypted_data) + unpadder.finalize()
+                # Decrypt every chunk straight into one buffer allocated up
+                # front (we need all of it to remove the PKCS7 padding);
+                # update_into() wants one block's worth of slack at the end
+                decrypted = bytearray(file_size + BLOCK_LEN - 1)
+                written = 0
+                # Chunks are memoryview slices of the mapping, so the
+                # ciphertext is never copied out of the page cache
+                with memoryview(decrypted) as out, memoryview(mm) as src:
+                    for offset in range(0, file_size, chunk_size):
+                        written += decryptor.update_into(
+                            src[offset : offset + chunk_size], out[written:]
+                        )
+                decryptor.finalize()
+
+                # Remove the slack and PKCS7 padding in place
+                del decrypted[written:]
+                pad_len = _pkcs7_pad_length(decrypted)
+                del decrypted[-pad_len:]
+
+                return decrypted
+
+    @staticmethod
+    def new_buffer(chunk_size: int = 64 * 1024) -> bytearray:
+        """
+        Make an output buffer for decrypt_to_path() with this chunk size.
 
-                return data
+        A thread decrypting many files can make one of these and pass it to
+        every call instead of allocating fresh output for every chunk.
+        """
+        # update_into() needs room for one block more than the input, less one
+        return bytearray(chunk_size + BLOCK_LEN - 1)
 
     def decrypt_to_path(
-        self, mpfile: EncryptedMPFile, dest_path: Path, chunk_size: int = 64 * 1024
+        self,
+        mpfile: EncryptedMPFile,
+        dest_path: Path,
+        chunk_size: int = 64 * 1024,
+        buffer: Optional[bytearray] = None,
     ) -> None:
         """
         Decrypt an EncryptedMPFile and save directly to destination file.
 
+        Each decrypted chunk is written out as soon as it's produced, so the
+        plaintext is never held in memory all at once; the PKCS7 padding is
+        checked at the end and truncated off the file. If decryption fails,
+        the partially-written destination file is removed.
+
         Args:
             mpfile: EncryptedMPFile object with path and IV
             dest_path: Path to save decrypted file
             chunk_size: Size of chunks to process at once (default: 64KB)
+            buffer: Output buffer from new_buffer(chunk_size) to reuse; one
+                is allocated if not given. Not safe to share between threads.
         """
-        # Decrypt using the main decrypt method
-        decrypted_data = self.decrypt(mpfile, chunk_size)
+        if buffer is None:
+            buffer = self.new_buffer(chunk_size)
+        out = memoryview(buffer)
 
-        # Write to destination file
-        with open(dest_path, "wb") as output_file:
-            output_file.write(decrypted_data)
+        with open(mpfile.path, "rb") as f, open(dest_path, "wb") as output_file:
+            try:
+                file_size = os.fstat(f.fileno()).st_size
+                if file_size == 0:
+                    return
+
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    _advise_sequential(mm)
+                    cipher = Cipher(self._algorithm, modes.CBC(mpfile.iv))
+                    decryptor = cipher.decryptor()
+
+                    # Keep the last block we wrote around so we can check
+                    # the padding without reading the output back
+                    last_block = b""
+                    written = 0
+                    # Chunks are memoryview slices of the mapping, so the
+                    # ciphertext is never copied out of the page cache. The
+                    # view has to be released before the mapping closes.
+                    with memoryview(mm) as src:
+                        for offset in range(0, file_size, chunk_size):
+                            n = decryptor.update_into(
+                                src[offset : offset + chunk_size], buffer
+                            )
+                            output_file.write(out[:n])
+                            written += n
+                            if n >= BLOCK_LEN:
+                                last_block = bytes(out[n - BLOCK_LEN : n])
+                            else:
+                                last_block = (last_block + out[:n])[-BLOCK_LEN:]
+
+                    final_chunk = decryptor.finalize()
+                    output_file.write(final_chunk)
+                    written += len(final_chunk)
+                    last_block = (last_block + final_chunk)[-BLOCK_LEN:]
+
+                    pad_len = _pkcs7_pad_length(last_block)
+                    output_file.flush()
+                    os.ftruncate(output_file.fileno(), written - pad_len)
+            except Exception:
+                output_file.close()
+                Path(dest_path).unlink(missing_ok=True)
+                raise
 
     def get_file_info(self, mpfile: EncryptedMPFile) -> dict:
         """
@@ -1,16 +1,28 @@
 """Utility functions for the MindPulse Endpoint POC."""
 
-import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from werkzeug.utils import secure_filename
 
 
+# Size unit suffix -> bytes, with and without the trailing B, so a unit is
+# resolved in a single lookup
+_SIZE_MULTIPLIERS = {
+    unit + b: 1024 ** power
+    for power, unit in enumerate(('', 'K', 'M', 'G', 'T'))
+    for b in ('', 'B')
+}
+
+
+@lru_cache(maxsize=128)
 def parse_size_string(size_str: str) -> int:
     """
     Parse a human-readable size string into bytes.
     
     Supports formats like: "16M", "1GB", "512K", "2TB", etc.
+    Results are cached; these come from config, so the same few strings get
+    parsed over and over.
     
     Args:
         size_str: Human-readable size string (e.g., "16M", "1GB")
@@ -27,26 +39,36 @@ def parse_size_string(size_str: str) -> int:
     # Remove any whitespace and convert to uppercase
     size_str = size_str.strip().upper()
     
-    # Pattern to match: number + optional unit (K, M, G, T)
-    pattern = r'^(\d+(?:\.\d+)?)\s*(K|M|G|T)?B?$'
-    match = re.match(pattern, size_str)
-    
-    if not match:
-        raise ValueError(f"Invalid size format: {size_str}. Use format like '16M', '1GB', etc.")
+    # Scan a number (digits, optionally followed by "." and more digits) by
+    # hand; this is much cheaper than going through a regex
+    end = len(size_str)
+    i = 0
+    while i < end and "0" <= size_str[i] <= "9":
+        i += 1
+    if i == 0:
+        raise _invalid_size(size_str)
+    is_fraction = i < end and size_str[i] == "."
+    if is_fraction:
+        frac_start = i = i + 1
+        while i < end and "0" <= size_str[i] <= "9":
+            i += 1
+        if i == frac_start:
+            raise _invalid_size(size_str)
+    number = size_str[:i]
     
-    number = float(match.group(1))
-    unit = match.group(2) or ''  # Default to bytes if no unit
+    # Then an optional unit (K, M, G, T) and an optional B
+    multiplier = _SIZE_MULTIPLIERS.get(size_str[i:].lstrip())
+    if multiplier is None:
+        raise _invalid_size(size_str)
     
-    # Convert to bytes
-    multipliers = {
-        '': 1,
-        'K': 1024,
-        'M': 1024 ** 2,
-        'G': 1024 ** 3,
-        'T': 1024 ** 4,
-    }
-    
-    return int(number * multipliers[unit])
+    # Stay in integer math unless there's a fractional part
+    if is_fraction:
+        return int(float(number) * multiplier)
+    return int(number) * multiplier
+
+
+def _invalid_size(size_str: str) -> ValueError:
+    return ValueError(f"Invalid size format: {size_str}. Use format like '16M', '1GB', etc.")
 
 
 def ensure_directory_exists(directory_path: Path) -> None:
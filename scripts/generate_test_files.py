@@ -37,6 +37,17 @@ from app import create_app
 
 logger = logging.getLogger(__name__)
 
+# File extension -> file type, flattened once at import
+_EXT_TO_TYPE = {
+    ext: file_type
+    for exts, file_type in (
+        ((".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tiff", ".tif"), "image"),
+        ((".json", ".xml", ".csv"), "data"),
+        ((".txt", ".log", ".md"), "text"),
+    )
+    for ext in exts
+}
+
 
 def generate_plausible_timestamps(count: int, days_back: int = 7) -> List[datetime]:
     """
@@ -54,16 +65,13 @@ def generate_plausible_timestamps(count: int, days_back: int = 7) -> List[dateti
     now = datetime.now(local_tz)
     start_time = now - timedelta(days=days_back)
 
-    timestamps = []
-    for i in range(count):
-        # Spread timestamps randomly over the time period
-        random_seconds = random.randint(0, int((now - start_time).total_seconds()))
-        timestamp = start_time + timedelta(seconds=random_seconds)
-        timestamps.append(timestamp)
+    # Spread timestamps randomly over the time period: draw all the offsets
+    # in one call, and sort those plain ints rather than datetimes
+    span_seconds = int((now - start_time).total_seconds())
+    offsets = random.choices(range(span_seconds + 1), k=count)
+    offsets.sort()
 
-    # Sort timestamps chronologically
-    timestamps.sort()
-    return timestamps
+    return [start_time + timedelta(seconds=offset) for offset in offsets]
 
 
 def get_file_type_from_extension(file_path: Path) -> str:
@@ -76,16 +84,7 @@ def get_file_type_from_extension(file_path: Path) -> str:
     Returns:
         File type string (e.g., 'image', 'data', 'text')
     """
-    ext = file_path.suffix.lower()
-
-    if ext in [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tiff", ".tif"]:
-        return "image"
-    elif ext in [".json", ".xml", ".csv"]:
-        return "data"
-    elif ext in [".txt", ".log", ".md"]:
-        return "text"
-    else:
-        return "file"
+    return _EXT_TO_TYPE.get(file_path.suffix.lower(), "file")
 
 
 def generate_encrypted_filename(
@@ -190,18 +189,17 @@ def main():
             # Determine file type
             file_type = get_file_type_from_extension(source_file)
 
-            # Encrypt the file
-            logger.debug(f"Encrypting {source_file}")
-            iv = encryptor.encrypt_file(source_file, Path("/tmp/temp_encrypted"))
-
-            # Generate proper filename
+            # The IV is part of the filename, so pick it first and encrypt
+            # straight to the final path
+            iv = models.Encryptor.generate_iv()
             encrypted_filename = generate_encrypted_filename(
                 short_key, timestamp, file_type, iv, source_file.suffix
             )
-
-            # Move to final location
             final_path = output_path / encrypted_filename
-            Path("/tmp/temp_encrypted").rename(final_path)
+
+            # Encrypt the file
+            logger.debug(f"Encrypting {source_file}")
+            encryptor.encrypt_file(source_file, final_path, iv=iv)
 
             logger.info(f"Generated: {encrypted_filename}")
             generated_count += 1
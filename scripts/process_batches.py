@@ -8,7 +8,7 @@ and when it does:
 set <batch_name> to the basename of the directory
 
 * Moves the directory to PROCESSING_PATH/in/<batch_name>
-* Creates PROCESSING_PATH/out/<batch_name>
+* Creates READY_FOR_UPLOAD_PATH/.incoming-<batch_name>
 * For each file in the in path:
   * Find the enrollment key for it
   * Set the target path to be {short_hash}/{date_part_of_timestamp}/{type}/{filename_without_iv}.ext
@@ -18,12 +18,14 @@ So, if our batch is in tmp1234 and contains:
 8ce4d5e6_2025-09-20T092542-0500_image_5ea30e9f40ce2e43d0b66c11c8324b05.png
 8ce4d5e6_2025-09-21T172517-0500_metadata_101351bfd5e3812e8c14e5a7a46dd63b.json
 
-we will get, in out/tmp1234:
+we will get, in .incoming-tmp1234:
 8ce4d5e6/2025-09-20/image/8ce4d5e6_2025-09-20T092542-0500_image.png
 8ce4d5e6/2025-09-20/metadata/8ce4d5e6_2025-09-21T172517-0500_metadata.json
 
 
-After that is complete, we'll move out/tmp1234 to READY_FOR_UPLOAD_PATH/
+After that is complete, we'll rename .incoming-tmp1234 to
+READY_FOR_UPLOAD_PATH/tmp1234. Anything reading READY_FOR_UPLOAD_PATH should
+skip .incoming-* directories; they're batches still being decrypted.
 
 
 Options:
@@ -31,15 +33,22 @@ Options:
   --debug-copy=<dir>      Copy each batch to the specified directory before processing
 """
 
+import errno
+import functools
 import logging
+import os
+import queue
 import shutil
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Any
 
 from docopt import docopt
 from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 
 # Add the parent directory to sys.path to import the models and app
@@ -50,20 +59,101 @@ from app import create_app
 
 logger = logging.getLogger(__name__)
 
+# Filesystem types where inotify won't report changes made from other hosts
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "ceph", "fuse.sshfs"}
+
+
+def is_network_filesystem(path: Path) -> bool:
+    """
+    Best-effort check for whether path lives on a network filesystem, going by
+    the longest matching mount point in /proc/mounts. Returns False if we can't
+    tell (e.g. not on Linux).
+    """
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+
+    resolved = str(Path(path).resolve())
+    best_mount, best_type = "", ""
+    for mount_point, fs_type in mounts:
+        if resolved == mount_point or resolved.startswith(mount_point.rstrip("/") + "/"):
+            if len(mount_point) > len(best_mount):
+                best_mount, best_type = mount_point, fs_type
+    return best_type in NETWORK_FS_TYPES
+
+
+def _fast_move(src: Path, dst: Path):
+    """
+    Move src to dst with a single rename when they're on the same filesystem,
+    which is the usual case; only fall back to shutil.move's copy-and-delete
+    when the rename fails because they aren't.
+
+    If dst already exists, this is just shutil.move, which moves src into an
+    existing directory; os.replace would instead fail on a non-empty one and
+    silently replace an empty one.
+    """
+    if dst.exists():
+        shutil.move(src, dst)
+        return
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+
+@functools.lru_cache(maxsize=128)
+def load_decryptor(keys_path: Path, short_id: str) -> Decryptor:
+    """
+    Load the enrollment key for short_id and build a Decryptor for it.
+
+    A batch nearly always comes from a single enrollment, so this is cached
+    rather than re-reading the same key file for every file. Key files are
+    never rewritten once created, so cached entries don't go stale. Missing
+    keys raise FileNotFoundError, which isn't cached.
+    """
+    key = EnrollmentKey.load_for_short_sha(keys_path, short_id)
+    return Decryptor.from_enrollment_key(key)
+
 
 class BatchEventHandler(FileSystemEventHandler):
-    """Event handler for batch directory changes."""
+    """
+    Event handler for batch directory changes.
+
+    Each batch directory that arrives is queued for the processor's worker
+    thread, so an arrival costs O(1) instead of a rescan of the whole complete
+    batches directory.
+    """
 
     def __init__(self, processor: "BatchProcessor"):
         self.processor = processor
 
-    def on_any_event(self, event: FileSystemEvent):
-        """Handle any file system event in the complete batches directory."""
-        logger.info(
-            f"File system event detected: {event.event_type} - {event.src_path}"
-        )
-        # Just process everything in the complete batches directory
-        self.processor.process_all_complete_batches()
+    def on_created(self, event: FileSystemEvent):
+        """
+        Handle a new entry in the complete batches directory.
+
+        The upload endpoint renames a finished batch directory into
+        COMPLETE_BATCH_PATH in one step, so the directory showing up means the
+        batch is fully written; there's no need to wait for writes to settle.
+        (An unpaired inotify IN_MOVED_TO is reported as a created event.)
+        """
+        if event.is_directory:
+            self._batch_arrived(event.src_path)
+
+    def on_moved(self, event: FileSystemEvent):
+        """Handle a batch directory renamed within the complete batches directory."""
+        if event.is_directory:
+            self._batch_arrived(event.dest_path)
+
+    def _batch_arrived(self, path: str):
+        batch_dir = Path(path)
+        if batch_dir.parent != self.processor.complete_batch_path:
+            return
+        logger.info(f"Batch directory arrived: {batch_dir}")
+        self.processor.work_queue.put(batch_dir)
 
 
 class BatchProcessor:
@@ -85,21 +175,35 @@ class BatchProcessor:
         ]  # This is "READY_FOR_UPLOAD_PATH"
         self.failed_path = app_config["FAILED_PATH"]
         self.keys_path = app_config["KEYS_PATH"]
+        self.watch_force_polling = app_config.get("WATCH_FORCE_POLLING", False)
+        self.watch_poll_interval = app_config.get("WATCH_POLL_INTERVAL", 60)
+        self.decrypt_workers = app_config.get("DECRYPT_WORKERS")
         self.debug_copy_dir = Path(debug_copy_dir) if debug_copy_dir else None
 
+        # Batch directories waiting to be processed, fed by the watcher and
+        # drained by a single worker thread; None tells the worker to stop
+        self.work_queue = queue.Queue()
+        self._worker = None
+
+        # Each decrypt thread reuses one output buffer for all its files
+        self._thread_local = threading.local()
+
         # Ensure all directories exist (they should already from app initialization)
         for dir_path in [self.processing_path, self.processed_path, self.failed_path]:
             dir_path.mkdir(parents=True, exist_ok=True)
 
         # Create processing subdirectories
         (self.processing_path / "in").mkdir(parents=True, exist_ok=True)
-        (self.processing_path / "out").mkdir(parents=True, exist_ok=True)
 
         # Create debug copy directory if specified
         if self.debug_copy_dir:
             self.debug_copy_dir.mkdir(parents=True, exist_ok=True)
             logger.info(f"Debug copy enabled: batches will be copied to {self.debug_copy_dir}")
 
+    def staging_path(self, batch_name: str) -> Path:
+        """Where a batch's output is decrypted to before it's published."""
+        return self.processed_path / f".incoming-{batch_name}"
+
     def process_batch(self, batch_dir: Path) -> Dict[str, Any]:
         """
         Process a batch directory according to the new architecture.
@@ -118,6 +222,7 @@ class BatchProcessor:
         }
 
         batch_name = batch_dir.name
+        start_time = time.monotonic()
 
         try:
             # Debug copy: save a copy of the entire batch before processing
@@ -128,57 +233,47 @@ class BatchProcessor:
 
             # Move to processing/in/
             processing_in_path = self.processing_path / "in" / batch_name
-            shutil.move(batch_dir, processing_in_path)
+            _fast_move(batch_dir, processing_in_path)
             logger.info(f"Moved {batch_name} to processing/in/")
 
-            # Create processing/out/ directory
-            processing_out_path = self.processing_path / "out" / batch_name
+            # Create the output directory: a hidden staging directory right
+            # in processed/, so publishing the batch is one rename on the
+            # same filesystem no matter where processing/ lives
+            final_dest = self.processed_path / batch_name
+            processing_out_path = self.staging_path(batch_name)
             processing_out_path.mkdir(parents=True, exist_ok=True)
             logger.info(f"Created output directory: {processing_out_path}")
 
-            # Process each file in the input directory
-            for file_path in processing_in_path.iterdir():
-                if file_path.is_file():
+            # Find the files in the input directory. scandir's entries know
+            # their type from the directory read, so is_file() doesn't need a
+            # stat per entry like Path.iterdir() + is_file() does
+            with os.scandir(processing_in_path) as entries:
+                file_paths = [
+                    Path(entry.path)
+                    for entry in entries
+                    if entry.is_file(follow_symlinks=False)
+                ]
+
+            # Target directories already created for this batch; most files
+            # share a handful of short_id/date/type directories
+            created_dirs = set()
+
+            # Files are independent of each other, and the AES work and file
+            # I/O release the GIL, so decrypt them in parallel
+            with ThreadPoolExecutor(max_workers=self.decrypt_workers) as executor:
+                futures = {
+                    executor.submit(
+                        self._process_one_file,
+                        file_path,
+                        processing_out_path,
+                        created_dirs,
+                    ): file_path
+                    for file_path in file_paths
+                }
+                for future in as_completed(futures):
+                    file_path = futures[future]
                     try:
-                        logger.info(f"Processing file: {file_path.name}")
-
-                        # Parse the encrypted file
-                        mpfile = EncryptedMPFile.from_filename(file_path)
-
-                        # Load the enrollment key
-                        key = EnrollmentKey.load_for_short_sha(
-                            self.keys_path, mpfile.short_id
-                        )
-
-                        # Create decryptor
-                        decryptor = Decryptor.from_enrollment_key(key)
-
-                        # Get date part directly from datetime object
-                        date_part = mpfile.created_at.date().isoformat()
-
-                        # Create target directory structure: {short_hash}/{date_part}/{type}/
-                        target_dir = (
-                            processing_out_path
-                            / mpfile.short_id
-                            / date_part
-                            / mpfile.type
-                        )
-                        target_dir.mkdir(parents=True, exist_ok=True)
-
-                        # Create target filename without IV using parsed components
-                        # Original: 8ce4d5e6_2025-09-20T092542-0500_image_5ea30e9f40ce2e43d0b66c11c8324b05.png
-                        # Target: 8ce4d5e6_2025-09-20T092542-0500_image.png
-                        timestamp_str = mpfile.created_at.isoformat().replace(":", "")
-                        filename_without_iv = f"{mpfile.short_id}_{timestamp_str}_{mpfile.type}{file_path.suffix}"
-
-                        target_path = target_dir / filename_without_iv
-
-                        # Decrypt file to target location
-                        decryptor.decrypt_to_path(mpfile, target_path)
-
-                        logger.info(
-                            f"Successfully processed {file_path.name} -> {target_path}"
-                        )
+                        future.result()
                         results["files_processed"] += 1
 
                     except Exception as e:
@@ -188,11 +283,16 @@ class BatchProcessor:
                             f"Failed to process {file_path.name}: {e}"
                         )
 
-            # Move output directory to processed (ready for upload)
-            final_dest = self.processed_path / batch_name
-            if processing_out_path.exists():
-                shutil.move(processing_out_path, final_dest)
-                logger.info(f"Moved processed batch to: {final_dest}")
+            # One summary line per batch; the per-file lines are debug-only
+            logger.info(
+                f"Decrypted batch {batch_name}: {results['files_processed']} "
+                f"processed, {results['files_failed']} failed "
+                f"in {time.monotonic() - start_time:.2f}s"
+            )
+
+            # Publish the output directory in processed (ready for upload)
+            os.replace(processing_out_path, final_dest)
+            logger.info(f"Moved processed batch to: {final_dest}")
 
             # Clean up input directory
             if processing_in_path.exists():
@@ -203,11 +303,72 @@ class BatchProcessor:
             logger.error(f"Error processing batch {batch_name}: {e}")
             results["errors"].append(f"Batch processing error: {e}")
             results["files_failed"] += 1
+            # Partially decrypted output would otherwise sit in processed/
+            # forever, so get rid of it; the encrypted input is kept
+            staging = self.staging_path(batch_name)
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+                logger.info(f"Removed partial output: {staging}")
             # Don't handle failed batch movement here - let process_batch_safe handle it
             raise  # Re-raise so process_batch_safe can handle the failure
 
         return results
 
+    def _process_one_file(
+        self, file_path: Path, processing_out_path: Path, created_dirs: set
+    ) -> Path:
+        """
+        Decrypt a single encrypted file into the batch's output directory.
+
+        Args:
+            file_path: Path to the encrypted file
+            processing_out_path: The batch's output directory
+            created_dirs: Target directories already created for this batch;
+                updated with any this call creates
+
+        Returns:
+            Path of the decrypted file
+
+        Raises:
+            Exception: If the file can't be parsed, its key can't be loaded,
+                or decryption fails
+        """
+        logger.debug(f"Processing file: {file_path.name}")
+
+        # Parse the encrypted file
+        mpfile = EncryptedMPFile.from_filename(file_path)
+
+        # Get a decryptor for the file's enrollment key
+        decryptor = load_decryptor(self.keys_path, mpfile.short_id)
+
+        # Get date part directly from datetime object
+        date_part = mpfile.created_at.date().isoformat()
+
+        # Create target directory structure: {short_hash}/{date_part}/{type}/
+        target_dir = processing_out_path / mpfile.short_id / date_part / mpfile.type
+        if target_dir not in created_dirs:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(target_dir)
+
+        # Create target filename without IV using parsed components
+        # Original: 8ce4d5e6_2025-09-20T092542-0500_image_5ea30e9f40ce2e43d0b66c11c8324b05.png
+        # Target: 8ce4d5e6_2025-09-20T092542-0500_image.png
+        timestamp_str = mpfile.created_at.isoformat().replace(":", "")
+        filename_without_iv = (
+            f"{mpfile.short_id}_{timestamp_str}_{mpfile.type}{file_path.suffix}"
+        )
+
+        target_path = target_dir / filename_without_iv
+
+        # Decrypt file to target location, reusing this thread's buffer
+        buffer = getattr(self._thread_local, "buffer", None)
+        if buffer is None:
+            buffer = self._thread_local.buffer = Decryptor.new_buffer()
+        decryptor.decrypt_to_path(mpfile, target_path, buffer=buffer)
+
+        logger.debug(f"Successfully processed {file_path.name} -> {target_path}")
+        return target_path
+
     def process_batch_safe(self, batch_dir: Path):
         """Safely process a batch with error handling."""
         batch_name = batch_dir.name
@@ -237,14 +398,13 @@ class BatchProcessor:
         possible_locations = [
             self.complete_batch_path / batch_name,
             self.processing_path / "in" / batch_name,
-            self.processing_path / "out" / batch_name,
         ]
 
         moved = False
         for location in possible_locations:
             if location.exists():
                 try:
-                    shutil.move(location, failed_dest)
+                    _fast_move(location, failed_dest)
                     logger.warning(
                         f"Moved failed batch to: {failed_dest} (reason: {reason})"
                     )
@@ -260,9 +420,9 @@ class BatchProcessor:
                 f"Could not find batch {batch_name} to move to failed directory"
             )
 
-    def process_all_complete_batches(self):
-        """Process all directories in the complete batch path."""
-        logger.info("Processing all batches in complete directory...")
+    def queue_complete_batches(self):
+        """Queue every directory in the complete batch path for the worker."""
+        logger.info("Queueing all batches in complete directory...")
 
         if not self.complete_batch_path.exists():
             logger.warning(
@@ -270,31 +430,68 @@ class BatchProcessor:
             )
             return
 
-        # Process each directory in complete batches
-        for item in self.complete_batch_path.iterdir():
-            if item.is_dir():
-                logger.info(f"Found batch to process: {item.name}")
-                self.process_batch_safe(item)
+        # Queue each directory in complete batches
+        with os.scandir(self.complete_batch_path) as entries:
+            batch_names = sorted(
+                entry.name for entry in entries if entry.is_dir(follow_symlinks=False)
+            )
 
-        logger.info("Finished processing all complete batches")
+        for name in batch_names:
+            batch_dir = self.complete_batch_path / name
+            logger.info(f"Found batch to process: {batch_dir.name}")
+            self.work_queue.put(batch_dir)
+
+        logger.info(f"Queued {len(batch_names)} batches from complete directory")
 
     def start_processing(self):
         """Start the batch processing system."""
         logger.info("Starting batch processing system")
 
-        # Process any existing batches first
-        self.process_all_complete_batches()
-
-        # Start file watcher
+        # Start the worker and the file watcher that feeds it before looking
+        # for existing batches, so a batch that arrives while those are being
+        # listed (or worked through) is still seen by the watcher
+        self._worker = threading.Thread(
+            target=self._work, name="batch-worker", daemon=True
+        )
+        self._worker.start()
         observer = self.start_watching()
 
+        # Then queue any batches that were already waiting
+        self.queue_complete_batches()
+
         logger.info("Batch processing system started")
         return observer
 
+    def stop(self):
+        """Stop the worker thread once it has finished the batches already queued."""
+        if self._worker is not None:
+            self.work_queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def _work(self):
+        """Worker thread: process queued batch directories one at a time."""
+        while True:
+            batch_dir = self.work_queue.get()
+            try:
+                if batch_dir is None:
+                    return
+                # A batch that was already waiting at startup can be queued by
+                # both the watcher and the startup sweep; the first one to be
+                # worked on moves it away
+                if batch_dir.is_dir():
+                    self.process_batch_safe(batch_dir)
+            finally:
+                self.work_queue.task_done()
+
     def start_watching(self):
         """Start watching the complete batch directory for new batches."""
         event_handler = BatchEventHandler(self)
-        observer = Observer()
+        if self.watch_force_polling or is_network_filesystem(self.complete_batch_path):
+            observer = PollingObserver(timeout=self.watch_poll_interval)
+            logger.info(f"Polling for new batches every {self.watch_poll_interval}s")
+        else:
+            observer = Observer()
         observer.schedule(event_handler, str(self.complete_batch_path), recursive=False)
         observer.start()
 
@@ -341,9 +538,10 @@ def main():
     except KeyboardInterrupt:
         logger.info("Shutting down batch processor...")
 
-        # Stop the file observer
+        # Stop the file observer, then let the worker finish what's queued
         observer.stop()
         observer.join()
+        processor.stop()
 
         logger.info("Batch processor stopped")
 
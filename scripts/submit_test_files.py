@@ -22,11 +22,12 @@ Examples:
 import logging
 import random
 import requests
+import secrets
 import sys
 import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List
 
 from docopt import docopt
 
@@ -38,6 +39,20 @@ from app import create_app
 
 logger = logging.getLogger(__name__)
 
+# File extension -> file type, flattened once at import
+_EXT_TO_TYPE = {
+    ext: file_type
+    for exts, file_type in (
+        ((".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tiff", ".tif"), "screenshot"),
+        ((".json", ".xml", ".csv"), "metadata"),
+        ((".txt", ".log", ".md"), "text"),
+    )
+    for ext in exts
+}
+
+# One generator for the whole run, seeded once when the module loads
+_rng = random.Random()
+
 
 def generate_plausible_timestamps(count: int, days_back: int = 7) -> List[datetime]:
     """
@@ -55,16 +70,13 @@ def generate_plausible_timestamps(count: int, days_back: int = 7) -> List[dateti
     now = datetime.now(local_tz)
     start_time = now - timedelta(days=days_back)
 
-    timestamps = []
-    for i in range(count):
-        # Spread timestamps randomly over the time period
-        random_seconds = random.randint(0, int((now - start_time).total_seconds()))
-        timestamp = start_time + timedelta(seconds=random_seconds)
-        timestamps.append(timestamp)
+    # Spread timestamps randomly over the time period: draw all the offsets
+    # in one call, and sort those plain ints rather than datetimes
+    span_seconds = int((now - start_time).total_seconds())
+    offsets = _rng.choices(range(span_seconds + 1), k=count)
+    offsets.sort()
 
-    # Sort timestamps chronologically
-    timestamps.sort()
-    return timestamps
+    return [start_time + timedelta(seconds=offset) for offset in offsets]
 
 
 def get_file_type_from_extension(file_path: Path) -> str:
@@ -75,18 +87,9 @@ def get_file_type_from_extension(file_path: Path) -> str:
         file_path: Path to the file
 
     Returns:
-        File type string (e.g., 'image', 'data', 'text')
+        File type string (e.g., 'screenshot', 'metadata', 'text')
     """
-    ext = file_path.suffix.lower()
-
-    if ext in [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tiff", ".tif"]:
-        return "screenshot"
-    elif ext in [".json", ".xml", ".csv"]:
-        return "metadata"
-    elif ext in [".txt", ".log", ".md"]:
-        return "text"
-    else:
-        return "file"
+    return _EXT_TO_TYPE.get(file_path.suffix.lower(), "file")
 
 
 def generate_encrypted_filename(
@@ -113,13 +116,39 @@ def generate_encrypted_filename(
     return f"{short_key}_{timestamp_str}_{file_type}_{iv_hex}{original_ext}"
 
 
+def load_encryptor(keys_path: Path, short_key: str) -> models.Encryptor:
+    """
+    Load the enrollment key for short_key and build an Encryptor for it.
+
+    Args:
+        keys_path: Path to enrollment keys directory
+        short_key: 8-character hex short key
+
+    Returns:
+        Encryptor for the enrollment key
+    """
+    try:
+        enrollment_key = models.EnrollmentKey.load_for_short_sha(keys_path, short_key)
+        logger.info(f"Loaded enrollment key: {enrollment_key.short_sha}")
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Enrollment key file not found for short key: {short_key}"
+        )
+
+    return models.Encryptor.from_enrollment_key(enrollment_key)
+
+
 def create_encrypted_files(
-    short_key: str, source_files: List[str], days_back: int = 7
+    encryptor: models.Encryptor,
+    short_key: str,
+    source_files: List[str],
+    days_back: int = 7,
 ) -> List[Path]:
     """
     Create encrypted files in a temporary directory.
 
     Args:
+        encryptor: Encryptor for the enrollment key (see load_encryptor)
         short_key: 8-character hex short key
         source_files: List of source file paths
         days_back: Days back to spread timestamps
@@ -127,63 +156,117 @@ def create_encrypted_files(
     Returns:
         List of paths to encrypted files
     """
-    # Create Flask app to get configuration
-    app = create_app()
+    # Generate timestamps for each source file
+    count = len(source_files)
+    timestamps = generate_plausible_timestamps(count, days_back)
 
-    with app.app_context():
-        keys_path = app.config["KEYS_PATH"]
-        logger.debug(f"Using keys path: {keys_path}")
+    # Create temporary directory for encrypted files
+    temp_dir = Path(tempfile.mkdtemp())
+    logger.debug(f"Created temporary directory: {temp_dir}")
 
-        # Load enrollment key
-        try:
-            enrollment_key = models.EnrollmentKey.load_for_short_sha(
-                keys_path, short_key
-            )
-            logger.info(f"Loaded enrollment key: {enrollment_key.short_sha}")
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                f"Enrollment key file not found for short key: {short_key}"
-            )
+    encrypted_files = []
 
-        # Create encryptor
-        encryptor = models.Encryptor.from_enrollment_key(enrollment_key)
+    for i, source_file_path in enumerate(source_files):
+        # Use the specific source file
+        source_file = Path(source_file_path)
+        timestamp = timestamps[i]
 
-        # Generate timestamps for each source file
-        count = len(source_files)
-        timestamps = generate_plausible_timestamps(count, days_back)
+        # Determine file type
+        file_type = get_file_type_from_extension(source_file)
 
-        # Create temporary directory for encrypted files
-        temp_dir = Path(tempfile.mkdtemp())
-        logger.debug(f"Created temporary directory: {temp_dir}")
+        # The IV is part of the filename, so pick it first and encrypt
+        # straight to the final path instead of renaming afterwards
+        iv = models.Encryptor.generate_iv()
+        encrypted_filename = generate_encrypted_filename(
+            short_key, timestamp, file_type, iv, source_file.suffix
+        )
+        final_path = temp_dir / encrypted_filename
 
-        encrypted_files = []
+        # Encrypt the file
+        logger.debug(f"Encrypting {source_file}")
+        encryptor.encrypt_file(source_file, final_path, iv=iv)
 
-        for i, source_file_path in enumerate(source_files):
-            # Use the specific source file
-            source_file = Path(source_file_path)
-            timestamp = timestamps[i]
+        encrypted_files.append(final_path)
+        logger.info(f"Created encrypted file: {encrypted_filename}")
 
-            # Determine file type
-            file_type = get_file_type_from_extension(source_file)
+    return encrypted_files
 
-            # Encrypt the file
-            logger.debug(f"Encrypting {source_file}")
-            temp_encrypted = temp_dir / f"temp_{i}"
-            iv = encryptor.encrypt_file(source_file, temp_encrypted)
 
-            # Generate proper filename
-            encrypted_filename = generate_encrypted_filename(
-                short_key, timestamp, file_type, iv, source_file.suffix
-            )
+class MultipartStream:
+    """
+    A multipart/form-data request body that's generated as it's sent.
 
-            # Move to final location
-            final_path = temp_dir / encrypted_filename
-            temp_encrypted.rename(final_path)
+    requests.post(files=...) builds the whole body in memory before sending
+    it. Passing one of these as data= instead lets requests read the body a
+    chunk at a time, so only one chunk of one file is in memory at once.
+    It knows its total length up front, so the upload still gets a normal
+    Content-Length header rather than chunked transfer encoding.
 
-            encrypted_files.append(final_path)
-            logger.info(f"Created encrypted file: {encrypted_filename}")
+    Each file is only opened when the body reaches it and closed before the
+    next one, so there's never more than one file open however many we send.
+    """
 
-        return encrypted_files
+    def __init__(self, fields, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            fields: Iterable of (name, filename, file path, content_type)
+            chunk_size: Size of chunks to read from each file
+        """
+        boundary = secrets.token_hex(16)
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self.chunk_size = chunk_size
+
+        self._parts = []
+        self._length = 0
+        for name, filename, file_path, content_type in fields:
+            header = (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode()
+            size = Path(file_path).stat().st_size
+            self._parts.append((header, file_path))
+            self._length += len(header) + size + 2  # trailing CRLF
+        self._trailer = f"--{boundary}--\r\n".encode()
+        self._length += len(self._trailer)
+
+        self._chunks = self._generate()
+        # Body generated but not read yet starts at _offset in _buffer; reads
+        # just move the offset rather than re-slicing the rest of the buffer
+        self._buffer = bytearray()
+        self._offset = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _generate(self) -> Iterator[bytes]:
+        for header, file_path in self._parts:
+            yield header
+            with open(file_path, "rb") as file_handle:
+                while chunk := file_handle.read(self.chunk_size):
+                    yield chunk
+            yield b"\r\n"
+        yield self._trailer
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes of the body (all of the rest if size < 0)."""
+        while size < 0 or len(self._buffer) - self._offset < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            # Drop what's been read before topping up, which only moves the
+            # unread tail (less than one read's worth) down to the front
+            del self._buffer[: self._offset]
+            self._offset = 0
+            self._buffer += chunk
+
+        end = len(self._buffer)
+        if size >= 0:
+            end = min(end, self._offset + size)
+        with memoryview(self._buffer)[self._offset : end] as unread:
+            data = bytes(unread)
+        self._offset = end
+        return data
 
 
 def submit_files_to_api(
@@ -201,32 +284,27 @@ def submit_files_to_api(
     """
     upload_url = f"{api_endpoint}/api/v1/upload"
 
-    # Prepare files for upload
-    files_dict = {}
-    for i, file_path in enumerate(encrypted_files):
-        file_key = f"file{i+1}"
-        files_dict[file_key] = (
-            file_path.name,
-            open(file_path, "rb"),
-            "application/octet-stream",
-        )
+    # Prepare files for upload; they're opened one at a time as the body is
+    # sent, not here
+    fields = [
+        (f"file{i+1}", file_path.name, file_path, "application/octet-stream")
+        for i, file_path in enumerate(encrypted_files)
+    ]
 
     try:
         logger.info(f"Submitting {len(encrypted_files)} files to {upload_url}")
 
         # Log what we're sending
         print("\n=== Files Being Sent to Server ===")
-        for file_key, (filename, file_handle, content_type) in files_dict.items():
-            file_size = file_handle.seek(0, 2)  # Get file size
-            file_handle.seek(0)  # Reset file pointer
-            logger.info(f"{file_key}: {filename} ({file_size} bytes)")
+        for file_key, filename, file_path, content_type in fields:
+            logger.info(f"{file_key}: {filename} ({file_path.stat().st_size} bytes)")
         print()
 
-        response = requests.post(upload_url, files=files_dict)
-
-        # Close all file handles
-        for file_tuple in files_dict.values():
-            file_tuple[1].close()
+        # Stream the body rather than having requests build it in memory
+        body = MultipartStream(fields)
+        response = requests.post(
+            upload_url, data=body, headers={"Content-Type": body.content_type}
+        )
 
         logger.info(f"API response: {response.status_code}")
 
@@ -245,15 +323,6 @@ def submit_files_to_api(
         logger.error(f"Request failed: {e}")
         return {"error": "Request failed", "details": str(e)}
 
-    except Exception as e:
-        # Make sure we close file handles even if something goes wrong
-        for file_tuple in files_dict.values():
-            try:
-                file_tuple[1].close()
-            except:
-                pass
-        raise
-
 
 def cleanup_temp_files(encrypted_files: List[Path]):
     """Clean up temporary encrypted files."""
@@ -313,8 +382,16 @@ def main():
     encrypted_files = []
 
     try:
+        # Create Flask app to get configuration, just once up front
+        app = create_app()
+        keys_path = app.config["KEYS_PATH"]
+        logger.debug(f"Using keys path: {keys_path}")
+        encryptor = load_encryptor(keys_path, short_key)
+
         # Create encrypted files
-        encrypted_files = create_encrypted_files(short_key, source_files, days_back)
+        encrypted_files = create_encrypted_files(
+            encryptor, short_key, source_files, days_back
+        )
 
         # Submit to API
         response = submit_files_to_api(api_endpoint, encrypted_files)
@@ -0,0 +1,38 @@
+"""Shared test setup."""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from mindpulse_endpoint_poc.models import EnrollmentKey
+
+# Short keys the upload tests name their files with
+TEST_SHORT_KEYS = ("12345678", "87654321")
+
+# Keep test uploads and keys out of the real data directories. RAM-backed
+# where available, since none of it needs to survive the run. This has to
+# happen at import, before app.py builds its module-level app from the
+# environment.
+_TEST_ROOT = Path(
+    tempfile.mkdtemp(
+        prefix="mindpulse_tests_",
+        dir="/dev/shm" if os.path.isdir("/dev/shm") else None,
+    )
+)
+os.environ["MINDPULSE_UPLOAD_PATH"] = str(_TEST_ROOT / "uploads")
+os.environ["MINDPULSE_KEYS_PATH"] = str(_TEST_ROOT / "keys")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_data_root():
+    """Seed the test enrollment keys, and remove all test data afterwards."""
+    keys_path = _TEST_ROOT / "keys"
+    keys_path.mkdir(parents=True, exist_ok=True)
+    for short_key in TEST_SHORT_KEYS:
+        key = EnrollmentKey.generate_random()
+        (keys_path / f"{short_key}.key").write_text(key.hexdata)
+    yield _TEST_ROOT
+    shutil.rmtree(_TEST_ROOT, ignore_errors=True)
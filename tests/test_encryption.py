@@ -1,5 +1,6 @@
 """Tests for encryption and decryption models."""
 
+import io
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -15,6 +16,12 @@ def enrollment_key():
     return EnrollmentKey.generate_random()
 
 
+@pytest.fixture(scope="session")
+def large_data():
+    """Create larger test data (1MB), once per session; bytes can't be modified."""
+    return b"A" * (1024 * 1024)
+
+
 @pytest.fixture
 def test_data():
     """Create test data for encryption."""
@@ -212,6 +219,32 @@ def test_different_file_types(enrollment_key):
             assert decrypted == test_data, f"Round-trip failed for {data_type} data"
 
 
+def test_decrypt_to_path_with_shared_buffer(enrollment_key):
+    """Test reusing one output buffer across several decrypt_to_path calls."""
+    encryptor = Encryptor.from_enrollment_key(enrollment_key)
+    decryptor = Decryptor.from_enrollment_key(enrollment_key)
+    buffer = Decryptor.new_buffer(chunk_size=32)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        timestamp = datetime.now().astimezone().replace(microsecond=0)
+
+        # Sizes that end mid-chunk, on a chunk, and within the first block
+        for size in (100, 64, 5):
+            data = bytes(range(size))
+            source_file = temp_path / "source.bin"
+            source_file.write_bytes(data)
+
+            iv = Encryptor.generate_iv()
+            encrypted_file = temp_path / f"12345678_{timestamp.isoformat()}_data_{iv.hex()}.bin"
+            encryptor.encrypt_file(source_file, encrypted_file, iv=iv)
+
+            mpfile = EncryptedMPFile.from_filename(encrypted_file)
+            output_file = temp_path / "decrypted.bin"
+            decryptor.decrypt_to_path(mpfile, output_file, chunk_size=32, buffer=buffer)
+            assert output_file.read_bytes() == data
+
+
 def test_encryption_produces_different_outputs(enrollment_key, test_data):
     """Test that encrypting the same data multiple times produces different outputs."""
     encryptor = Encryptor.from_enrollment_key(enrollment_key)
@@ -276,6 +309,68 @@ def test_iv_length_and_format(enrollment_key, test_data):
     assert iv_decoded == iv
 
 
+def test_encrypt_file_with_explicit_iv(enrollment_key, test_data):
+    """Test encrypting straight to a final filename built from a pre-generated IV."""
+    encryptor = Encryptor.from_enrollment_key(enrollment_key)
+    decryptor = Decryptor.from_enrollment_key(enrollment_key)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+
+        source_file = temp_path / "source.txt"
+        source_file.write_bytes(test_data)
+
+        # Build the final filename before encrypting
+        iv = Encryptor.generate_iv()
+        assert len(iv) == 16
+        short_sha = enrollment_key.short_sha
+        timestamp = datetime.now().astimezone().replace(microsecond=0)
+        filename = f"{short_sha}_{timestamp.isoformat()}_text_{iv.hex()}.txt"
+        encrypted_file = temp_path / filename
+
+        returned_iv = encryptor.encrypt_file(source_file, encrypted_file, iv=iv)
+        assert returned_iv == iv
+
+        mpfile = EncryptedMPFile.from_filename(encrypted_file)
+        assert decryptor.decrypt(mpfile) == test_data
+
+
+def test_encrypt_stream_matches_encrypt(enrollment_key):
+    """Test that chunked stream encryption gives the same ciphertext as encrypt()."""
+    encryptor = Encryptor.from_enrollment_key(enrollment_key)
+    iv = Encryptor.generate_iv()
+
+    # Sizes around chunk and block boundaries
+    for size in (0, 15, 16, 17, 100, 128, 1000):
+        data = (bytes(range(256)) * 4)[:size]
+        expected, _ = encryptor.encrypt(data, iv)
+
+        dst = io.BytesIO()
+        returned_iv = encryptor.encrypt_stream(io.BytesIO(data), dst, iv, chunk_size=32)
+        assert returned_iv == iv
+        assert dst.getvalue() == expected
+
+
+def test_encrypt_file_matches_encrypt(enrollment_key):
+    """Test that memory-mapped file encryption gives the same ciphertext as encrypt()."""
+    encryptor = Encryptor.from_enrollment_key(enrollment_key)
+    iv = Encryptor.generate_iv()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        source_file = temp_path / "source.bin"
+        encrypted_file = temp_path / "encrypted.bin"
+
+        # Sizes around chunk and block boundaries, including empty
+        for size in (0, 15, 16, 17, 64, 100):
+            data = bytes(range(size))
+            source_file.write_bytes(data)
+            expected, _ = encryptor.encrypt(data, iv)
+
+            encryptor.encrypt_file(source_file, encrypted_file, iv=iv, chunk_size=32)
+            assert encrypted_file.read_bytes() == expected
+
+
 def test_decryptor_api_design(enrollment_key, test_data):
     """Test that the Decryptor API is designed around EncryptedMPFile objects."""
     encryptor = Encryptor.from_enrollment_key(enrollment_key)
@@ -343,11 +438,8 @@ def test_memory_mapped_decryption(enrollment_key, test_data):
         assert output_file.read_bytes() == test_data
 
 
-def test_memory_mapped_decryption_large_data(enrollment_key):
+def test_memory_mapped_decryption_large_data(enrollment_key, large_data):
     """Test memory-mapped decryption with larger data and different chunk sizes."""
-    # Create larger test data (1MB)
-    large_data = b"A" * (1024 * 1024)
-
     encryptor = Encryptor.from_enrollment_key(enrollment_key)
     decryptor = Decryptor.from_enrollment_key(enrollment_key)
 
@@ -420,4 +512,36 @@ def test_file_info_method(enrollment_key, test_data):
         assert info["created_at"] == mpfile.created_at
         assert info["type"] == "data"
         assert info["iv"] == iv.hex()
-        assert "estimated_decrypted_size" in info
\ No newline at end of file
+        assert "estimated_decrypted_size" in info
+
+
+def test_decrypt_with_wrong_key_fails(test_data):
+    """Test that a wrong key is caught by the padding check instead of truncating."""
+    # Fixed keys and IV so the garbage plaintext (and its bad padding) is
+    # deterministic; a random wrong key ends in valid padding ~1/256 of the time
+    enrollment_key = EnrollmentKey(hexdata="00" * 32)
+    encryptor = Encryptor.from_enrollment_key(enrollment_key)
+    wrong_decryptor = Decryptor.from_enrollment_key(EnrollmentKey(hexdata="11" * 32))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+
+        source_file = temp_path / "test.txt"
+        source_file.write_bytes(test_data)
+
+        iv = bytes(16)
+        timestamp = datetime.now().astimezone().replace(microsecond=0)
+        filename = f"{enrollment_key.short_sha}_{timestamp.isoformat()}_text_{iv.hex()}.txt"
+        encrypted_file = temp_path / filename
+        encryptor.encrypt_file(source_file, encrypted_file, iv=iv)
+
+        mpfile = EncryptedMPFile.from_filename(encrypted_file)
+
+        with pytest.raises(ValueError):
+            wrong_decryptor.decrypt(mpfile)
+
+        # Failed decryption shouldn't leave a partial output file behind
+        output_file = temp_path / "decrypted.txt"
+        with pytest.raises(ValueError):
+            wrong_decryptor.decrypt_to_path(mpfile, output_file)
+        assert not output_file.exists()
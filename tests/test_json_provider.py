@@ -0,0 +1,78 @@
+"""Tests for the orjson-backed JSON provider."""
+
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from mindpulse_endpoint_poc.json_provider import OrjsonProvider
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+VALUES = [
+    {"message": "2 files uploaded successfully", "successes": ["a.png"], "errors": []},
+    {"unicode": "café ☃"},
+    {"when": datetime(2025, 9, 25, 12, 0, tzinfo=timezone.utc), "day": date(2025, 9, 25)},
+    {"point": Point(1, 2)},
+    {"id": uuid.UUID("12345678-1234-5678-1234-567812345678"), "amount": Decimal("1.50")},
+    {2: "two", 10: "ten"},
+    {"big": 2 ** 70, "small": -(2 ** 70)},
+    [1, 2.5, None, True, "x"],
+    {"nan": float("nan"), "inf": float("inf"), "-inf": float("-inf")},
+]
+
+
+def decoded(text):
+    """
+    What JSON text decodes to, in a comparable form: NaN never equals itself,
+    so compare values by re-encoding them the same way.
+    """
+    return json.dumps(json.loads(text), sort_keys=True)
+
+
+@pytest.fixture(scope="module")
+def flask_app():
+    """A bare app, so the provider can be checked against Flask's default one."""
+    return Flask(__name__)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_dumps_matches_default_provider(flask_app, value):
+    """Test that output decodes to the same values as Flask's default provider's."""
+    ours = OrjsonProvider(flask_app).dumps(value)
+    theirs = DefaultJSONProvider(flask_app).dumps(value)
+    assert decoded(ours) == decoded(theirs)
+
+
+def test_dumps_unserializable_still_raises(flask_app):
+    """Test that objects neither provider can encode still raise TypeError."""
+    with pytest.raises(TypeError):
+        OrjsonProvider(flask_app).dumps({"x": object()})
+
+
+def test_loads(flask_app):
+    """Test that loads accepts both str and bytes."""
+    provider = OrjsonProvider(flask_app)
+    assert provider.loads('{"a": [1, 2]}') == {"a": [1, 2]}
+    assert provider.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_response_matches_default_provider(flask_app, value):
+    """Test that responses decode the same and end in a newline, like Flask's."""
+    with flask_app.app_context():
+        ours = OrjsonProvider(flask_app).response(value)
+        theirs = DefaultJSONProvider(flask_app).response(value)
+    assert ours.mimetype == theirs.mimetype
+    assert ours.data.endswith(b"\n")
+    assert decoded(ours.data) == decoded(theirs.data)
@@ -0,0 +1,217 @@
+"""Tests for the batch processor script."""
+
+import os
+import time
+
+import pytest
+
+from mindpulse_endpoint_poc.models import EnrollmentKey, Encryptor
+from scripts.process_batches import BatchProcessor, _fast_move
+
+PLAINTEXT = b"decrypted image data"
+TIMESTAMP = "2025-09-20T092542-0500"
+
+
+@pytest.fixture
+def enrollment_key():
+    """A random enrollment key."""
+    return EnrollmentKey.generate_random()
+
+
+@pytest.fixture
+def processor_config(tmp_path, enrollment_key):
+    """Processor config with every directory under tmp_path, and the key saved."""
+    config = {
+        "COMPLETE_BATCH_PATH": tmp_path / "02_complete_batches",
+        "PROCESSING_PATH": tmp_path / "03_processing",
+        "PROCESSED_PATH": tmp_path / "04_processed",
+        "FAILED_PATH": tmp_path / "99_failed",
+        "KEYS_PATH": tmp_path / "keys",
+    }
+    for path in config.values():
+        path.mkdir()
+    (config["KEYS_PATH"] / f"{enrollment_key.short_sha}.key").write_text(
+        enrollment_key.hexdata
+    )
+    return config
+
+
+def make_batch(config, enrollment_key, batch_name):
+    """
+    Write a batch holding one encrypted file, then rename it into the complete
+    batches directory in one step, as the upload endpoint does.
+    """
+    building = config["COMPLETE_BATCH_PATH"].parent / f"building-{batch_name}"
+    building.mkdir()
+    source = building.parent / f"{batch_name}.plain"
+    source.write_bytes(PLAINTEXT)
+    iv = Encryptor.generate_iv()
+    filename = f"{enrollment_key.short_sha}_{TIMESTAMP}_image_{iv.hex()}.png"
+    Encryptor.from_enrollment_key(enrollment_key).encrypt_file(
+        source, building / filename, iv=iv
+    )
+    os.rename(building, config["COMPLETE_BATCH_PATH"] / batch_name)
+
+
+def output_file(config, enrollment_key, batch_name):
+    """Where a published batch's decrypted file ends up."""
+    short_sha = enrollment_key.short_sha
+    return (
+        config["PROCESSED_PATH"] / batch_name / short_sha / "2025-09-20" / "image"
+        / f"{short_sha}_{TIMESTAMP}_image.png"
+    )
+
+
+def wait_for(path, timeout=10):
+    """Wait for path to exist, since the watcher and worker run in the background."""
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@pytest.mark.parametrize("dest_contents", [[], ["earlier.txt"]])
+def test_fast_move_into_existing_directory(tmp_path, dest_contents):
+    """Test that moving onto an existing directory moves into it, like shutil.move."""
+    src = tmp_path / "batch"
+    src.mkdir()
+    (src / "file.png").write_bytes(PLAINTEXT)
+    dst = tmp_path / "failed"
+    dst.mkdir()
+    for name in dest_contents:
+        (dst / name).write_bytes(b"earlier")
+
+    _fast_move(src, dst)
+
+    assert not src.exists()
+    assert (dst / "batch" / "file.png").read_bytes() == PLAINTEXT
+    assert sorted(p.name for p in dst.iterdir()) == sorted(dest_contents + ["batch"])
+
+
+def test_fast_move_renames(tmp_path):
+    """Test that moving to a new path renames src to it."""
+    src = tmp_path / "batch"
+    src.mkdir()
+    (src / "file.png").write_bytes(PLAINTEXT)
+
+    _fast_move(src, tmp_path / "moved")
+
+    assert not src.exists()
+    assert (tmp_path / "moved" / "file.png").read_bytes() == PLAINTEXT
+
+
+def test_failed_batch_moves_into_existing_failed_directory(processor_config, enrollment_key):
+    """Test that a failed batch still leaves processing/in when failed/<batch> exists."""
+    make_batch(processor_config, enrollment_key, "repeat")
+    processor = BatchProcessor(processor_config)
+    failed = processor_config["FAILED_PATH"] / "repeat"
+    failed.mkdir()
+    (failed / "earlier.txt").write_bytes(b"earlier")
+    in_path = processor_config["PROCESSING_PATH"] / "in" / "repeat"
+    _fast_move(processor_config["COMPLETE_BATCH_PATH"] / "repeat", in_path)
+
+    processor._move_batch_to_failed("repeat", "test")
+
+    assert not in_path.exists()
+    assert sorted(p.name for p in failed.iterdir()) == ["earlier.txt", "repeat"]
+
+
+def test_startup_sweep_queues_existing_batches(processor_config, enrollment_key):
+    """Test that batches already waiting are queued for the worker, not processed inline."""
+    make_batch(processor_config, enrollment_key, "batch_b")
+    make_batch(processor_config, enrollment_key, "batch_a")
+    processor = BatchProcessor(processor_config)
+
+    processor.queue_complete_batches()
+
+    queued = []
+    while not processor.work_queue.empty():
+        queued.append(processor.work_queue.get_nowait())
+    complete = processor_config["COMPLETE_BATCH_PATH"]
+    assert queued == [complete / "batch_a", complete / "batch_b"]
+    assert sorted(p.name for p in complete.iterdir()) == ["batch_a", "batch_b"]
+
+
+def test_batches_processed_through_queue(processor_config, enrollment_key, monkeypatch):
+    """Test that existing batches, and ones arriving while they're worked on, get published."""
+    make_batch(processor_config, enrollment_key, "before_startup")
+    processor = BatchProcessor(processor_config)
+
+    # Drop another batch in while the startup batch is being processed
+    process_batch_safe = processor.process_batch_safe
+
+    def process_and_drop(batch_dir):
+        if batch_dir.name == "before_startup":
+            make_batch(processor_config, enrollment_key, "during_startup")
+        process_batch_safe(batch_dir)
+
+    monkeypatch.setattr(processor, "process_batch_safe", process_and_drop)
+
+    observer = processor.start_processing()
+    try:
+        for batch_name in ("before_startup", "during_startup"):
+            output = output_file(processor_config, enrollment_key, batch_name)
+            assert wait_for(output), f"{batch_name} was never processed"
+            assert output.read_bytes() == PLAINTEXT
+    finally:
+        observer.stop()
+        observer.join()
+        processor.stop()
+
+    assert list(processor_config["COMPLETE_BATCH_PATH"].iterdir()) == []
+    assert list(processor_config["FAILED_PATH"].iterdir()) == []
+    assert sorted(p.name for p in processor_config["PROCESSED_PATH"].iterdir()) == [
+        "before_startup",
+        "during_startup",
+    ]
+
+
+def test_failed_batch_leaves_no_partial_output(processor_config, enrollment_key):
+    """Test that a batch failing after decryption starts leaves nothing in processed/."""
+    make_batch(processor_config, enrollment_key, "clashing")
+    processor = BatchProcessor(processor_config)
+
+    # Publishing fails: there's already a non-empty batch by that name
+    existing = processor_config["PROCESSED_PATH"] / "clashing"
+    existing.mkdir()
+    (existing / "earlier.txt").write_bytes(b"earlier")
+
+    processor.process_batch_safe(processor_config["COMPLETE_BATCH_PATH"] / "clashing")
+
+    assert not processor.staging_path("clashing").exists()
+    assert [p.name for p in existing.iterdir()] == ["earlier.txt"]
+    failed = processor_config["FAILED_PATH"] / "clashing"
+    assert [p.suffix for p in failed.iterdir()] == [".png"]
+    assert list(processor_config["COMPLETE_BATCH_PATH"].iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "created_at_str, expected_name",
+    [
+        ("2025-09-20T092542-0500", "2025-09-20T092542-0500"),
+        ("20250920T092542-0500", "2025-09-20T092542-0500"),
+        ("2025-09-20T092542Z", "2025-09-20T092542+0000"),
+        ("2025-09-20T092542.5-0500", "2025-09-20T092542.500000-0500"),
+    ],
+)
+def test_output_path_normalizes_timestamp(
+    processor_config, enrollment_key, tmp_path, created_at_str, expected_name
+):
+    """Test that output paths don't depend on how the filename spells its timestamp."""
+    source = tmp_path / "plain"
+    source.write_bytes(PLAINTEXT)
+    iv = Encryptor.generate_iv()
+    short_sha = enrollment_key.short_sha
+    encrypted = tmp_path / f"{short_sha}_{created_at_str}_image_{iv.hex()}.png"
+    Encryptor.from_enrollment_key(enrollment_key).encrypt_file(source, encrypted, iv=iv)
+    processor = BatchProcessor(processor_config)
+    out_dir = tmp_path / "out"
+
+    target = processor._process_one_file(encrypted, out_dir, set())
+
+    assert target == (
+        out_dir / short_sha / "2025-09-20" / "image" / f"{short_sha}_{expected_name}_image.png"
+    )
+    assert target.read_bytes() == PLAINTEXT
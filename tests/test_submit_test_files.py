@@ -0,0 +1,63 @@
+"""Tests for the test-file submission script."""
+
+from io import BytesIO
+
+import pytest
+from werkzeug.formparser import parse_form_data
+
+from scripts.submit_test_files import MultipartStream
+
+CHUNK_SIZE = 1024
+
+
+def read_all(stream, size):
+    """Read a body size bytes at a time, as http.client does."""
+    pieces = []
+    while piece := stream.read(size):
+        pieces.append(piece)
+    return b"".join(pieces)
+
+
+@pytest.fixture
+def upload_files(tmp_path):
+    """Files of 0 bytes, 1 byte, and a few chunks plus a bit."""
+    contents = {
+        "empty.bin": b"",
+        "one.bin": b"x",
+        "big.bin": bytes(range(256)) * 13,  # 3328 bytes
+    }
+    fields = []
+    for i, (filename, data) in enumerate(contents.items()):
+        path = tmp_path / filename
+        path.write_bytes(data)
+        fields.append((f"file{i+1}", filename, path, "application/octet-stream"))
+    return fields, contents
+
+
+@pytest.mark.parametrize("read_size", [8192, 100, 1, -1])
+def test_multipart_stream_round_trip(upload_files, read_size):
+    """Test that the body matches its Content-Length and parses back to the files."""
+    fields, contents = upload_files
+    stream = MultipartStream(fields, chunk_size=CHUNK_SIZE)
+
+    if read_size < 0:
+        body = stream.read()
+    else:
+        body = read_all(stream, read_size)
+    assert len(body) == len(stream)
+    assert stream.read(8192) == b""
+
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "CONTENT_TYPE": stream.content_type,
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": BytesIO(body),
+    }
+    _, form, files = parse_form_data(environ)
+    assert not form
+    assert sorted(files) == ["file1", "file2", "file3"]
+    for name, filename, _, content_type in fields:
+        part = files[name]
+        assert part.filename == filename
+        assert part.content_type == content_type
+        assert part.read() == contents[filename]
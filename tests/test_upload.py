@@ -1,24 +1,42 @@
 """Tests for the upload endpoint."""
 
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
 import pytest
+from flask import request
 
 from app import create_app
+from mindpulse_endpoint_poc.models import EnrollmentKey
 from mindpulse_endpoint_poc.utils import parse_size_string
 
 
-@pytest.fixture
+# Payload shared by the upload tests; bytes are immutable, so each test just
+# wraps it in its own BytesIO
+IMAGE_DATA = b"fake image data"
+
+
+@pytest.fixture(scope="session")
 def app():
-    """Create a test Flask application."""
+    """Create a test Flask application, once for the whole test session."""
     app = create_app()
+    app.config.update(TESTING=True)
     return app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(app):
-    """Create a test client."""
-    return app.test_client()
+    """Create a test client, shared by every test since it keeps no cookies."""
+    return app.test_client(use_cookies=False)
+
+
+@pytest.fixture(autouse=True)
+def restore_app_config(app):
+    """Undo any config changes a test makes, since the app is shared."""
+    saved_config = dict(app.config)
+    yield
+    app.config.clear()
+    app.config.update(saved_config)
 
 
 def test_parse_size_string():
@@ -76,11 +94,9 @@ def test_upload_single_file(client):
     """Test upload endpoint with a single file."""
     # Create a mock image file with proper naming format
     # Format: {short_id}_{created_at}_{type}_{iv}.ext
-    image_data = b"fake image data"
-
     response = client.post(
         "/api/v1/upload",
-        data={"file1": (BytesIO(image_data), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png")},
+        data={"file1": (BytesIO(IMAGE_DATA), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png")},
         content_type="multipart/form-data"
     )
 
@@ -112,13 +128,11 @@ def test_upload_invalid_filename_format(client):
 
 def test_upload_multiple_files_same_batch(client):
     """Test upload endpoint with multiple files in the same batch."""
-    image_data = b"fake image data"
-
     response = client.post(
         "/api/v1/upload",
         data={
-            "file1": (BytesIO(image_data), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png"),
-            "file2": (BytesIO(image_data), "12345678_2025-09-25T120500-0500_image_a1b2c3d4e5f6789012345678901234ab.png"),
+            "file1": (BytesIO(IMAGE_DATA), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png"),
+            "file2": (BytesIO(IMAGE_DATA), "12345678_2025-09-25T120500-0500_image_a1b2c3d4e5f6789012345678901234ab.png"),
         },
         content_type="multipart/form-data"
     )
@@ -132,13 +146,11 @@ def test_upload_multiple_files_same_batch(client):
 
 def test_upload_multiple_batches(client):
     """Test upload endpoint with files from different batches."""
-    image_data = b"fake image data"
-
     response = client.post(
         "/api/v1/upload",
         data={
-            "file1": (BytesIO(image_data), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png"),
-            "file2": (BytesIO(image_data), "87654321_2025-09-25T120500-0500_image_a1b2c3d4e5f6789012345678901234ab.jpg"),
+            "file1": (BytesIO(IMAGE_DATA), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png"),
+            "file2": (BytesIO(IMAGE_DATA), "87654321_2025-09-25T120500-0500_image_a1b2c3d4e5f6789012345678901234ab.jpg"),
         },
         content_type="multipart/form-data"
     )
@@ -152,14 +164,12 @@ def test_upload_multiple_batches(client):
 
 def test_upload_mixed_success_and_errors(client):
     """Test upload endpoint with both valid and invalid files (207 status)."""
-    image_data = b"fake image data"
-
     response = client.post(
         "/api/v1/upload",
         data={
-            "file1": (BytesIO(image_data), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png"),
-            "file2": (BytesIO(image_data), "invalid_file.txt"),
-            "file3": (BytesIO(image_data), "87654321_2025-09-25T120500-0500_image_a1b2c3d4e5f6789012345678901234ab.jpg"),
+            "file1": (BytesIO(IMAGE_DATA), "12345678_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png"),
+            "file2": (BytesIO(IMAGE_DATA), "invalid_file.txt"),
+            "file3": (BytesIO(IMAGE_DATA), "87654321_2025-09-25T120500-0500_image_a1b2c3d4e5f6789012345678901234ab.jpg"),
         },
         content_type="multipart/form-data"
     )
@@ -173,6 +183,29 @@ def test_upload_mixed_success_and_errors(client):
     assert "invalid_file.txt" in data["errors"][0]
 
 
+def test_upload_duplicate_filenames(app, client):
+    """Test that a second part with the same filename fails instead of overwriting the first."""
+    filename = "12345678_2025-09-25T130000-0500_image_f748062b37fcf5128420aa84201f0acb.png"
+    response = client.post(
+        "/api/v1/upload",
+        data={
+            "file1": (BytesIO(IMAGE_DATA), filename),
+            "file2": (BytesIO(b"other image data"), filename),
+        },
+        content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data["successes"] == [filename]
+    assert len(data["errors"]) == 1
+    assert "Duplicate filename" in data["errors"][0]
+
+    saved = list(app.config["COMPLETE_BATCH_PATH"].glob(f"*/{filename}"))
+    assert len(saved) == 1
+    assert saved[0].read_bytes() == IMAGE_DATA
+
+
 def test_upload_method_not_allowed(client):
     """Test upload endpoint with wrong HTTP method."""
     response = client.get("/api/v1/upload")
@@ -181,12 +214,10 @@ def test_upload_method_not_allowed(client):
 
 def test_upload_unknown_enrollment_key(client):
     """Test upload endpoint with file using unknown enrollment key."""
-    image_data = b"fake image data"
-
     # Use a short_id that doesn't have a corresponding enrollment key
     response = client.post(
         "/api/v1/upload",
-        data={"file1": (BytesIO(image_data), "99999999_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png")},
+        data={"file1": (BytesIO(IMAGE_DATA), "99999999_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png")},
         content_type="multipart/form-data"
     )
 
@@ -197,3 +228,41 @@ def test_upload_unknown_enrollment_key(client):
     assert data["successes"] == []
     assert len(data["errors"]) == 1
     assert "Enrollment key for 99999999 not found" in data["errors"][0]
+
+
+def test_upload_large_file(app, client):
+    """Test uploading a file big enough to be spooled to disk."""
+    keys_path = app.config["KEYS_PATH"]
+    key = EnrollmentKey.generate_and_persist_random(keys_path)
+    try:
+        large_data = bytes(range(256)) * (3 * 1024 * 4)  # 3MB
+        filename = f"{key.short_sha}_2025-09-25T120000-0500_image_f748062b37fcf5128420aa84201f0acb.png"
+
+        # The part is parsed into UploadRequest's spooled file, which has
+        # rolled over to disk; Werkzeug's own factory would use a 500kB limit
+        with app.test_request_context(
+            "/api/v1/upload",
+            method="POST",
+            data={"file1": (BytesIO(large_data), filename)},
+            content_type="multipart/form-data",
+        ):
+            stream = request.files["file1"].stream
+            assert isinstance(stream, SpooledTemporaryFile)
+            assert stream._max_size == app.config["UPLOAD_SPOOL_MAX_SIZE"]
+            assert stream._rolled
+
+        response = client.post(
+            "/api/v1/upload",
+            data={"file1": (BytesIO(large_data), filename)},
+            content_type="multipart/form-data"
+        )
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data["successes"] == [filename]
+
+        saved = list(app.config["COMPLETE_BATCH_PATH"].glob(f"*/{filename}"))
+        assert len(saved) == 1
+        assert saved[0].read_bytes() == large_data
+    finally:
+        (keys_path / f"{key.short_sha}.key").unlink(missing_ok=True)